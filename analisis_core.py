@@ -2,35 +2,57 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from collections import Counter
+from functools import lru_cache
+from itertools import islice
 from typing import Counter as CounterType
 from typing import Dict, Iterable, List, Tuple
-from urllib.parse import urlparse
 
 import nltk
 import pandas as pd
 from nltk.corpus import stopwords
-from unidecode import unidecode
 
-from datos_repository import (
-    guardar_pagina,
-    inicializar_bd,
-    registrar_menciones,
+from datos_repository import guardar_paginas_con_menciones, inicializar_bd
+from fuentes_web import (
+    PROFUNDIDAD_OPCIONES,
+    ResultadoBusqueda,
+    buscar_paginas_web,
+    extraer_dominio,
 )
-from fuentes_web import PROFUNDIDAD_OPCIONES, ResultadoBusqueda, buscar_paginas_web
 
 # Modos válidos para contar menciones.
 MODOS_COINCIDENCIA_VALIDOS = {"frase_exacta", "todas_las_palabras", "cualquiera"}
 
 # Caché de stopwords
-_stopwords_es: set | None = None
+_stopwords_es: frozenset[str] | None = None
+
+# Cadenas respaldadas por Arrow (pyarrow llega como dependencia de Streamlit).
+try:
+    import pyarrow  # noqa: F401
+
+    _DTYPE_CADENAS = "string[pyarrow]"
+except ImportError:
+    _DTYPE_CADENAS = "string"
+
+# Caracteres del texto original que se conservan en `df_paginas`.
+_LARGO_EXTRACTO_TEXTO = 300
+
+# Restos de URLs y parámetros de seguimiento que no aportan como palabras asociadas.
+_PALABRAS_RUIDO = frozenset({"amp", "utm", "https", "http"})
+
+# Ruido a eliminar (URLs, menciones/hashtags y todo lo que no sea letra, números
+# incluidos) en una sola pasada; compilado una vez al importar el módulo.
+_RE_RUIDO = re.compile(r"http\S+|www\.\S+|[@#]\w+|[^a-záéíóúñü\s]")
+# Tras la limpieza solo quedan estas letras acentuadas; basta una tabla fija.
+_TABLA_TILDES = str.maketrans("áéíóúñü", "aeiounu")
 
 
 # =========================
 # UTILIDADES DE STOPWORDS
 # =========================
-def asegurar_stopwords_espanol() -> set[str]:
+def asegurar_stopwords_espanol() -> frozenset[str]:
     """Devuelve las stopwords en español normalizadas sin tildes."""
 
     global _stopwords_es
@@ -43,10 +65,10 @@ def asegurar_stopwords_espanol() -> set[str]:
         nltk.download("stopwords")
         palabras = stopwords.words("spanish")
     except Exception:
-        _stopwords_es = set()
+        _stopwords_es = frozenset()
         return _stopwords_es
 
-    _stopwords_es = {unidecode(p.lower()) for p in palabras}
+    _stopwords_es = frozenset(p.lower().translate(_TABLA_TILDES) for p in palabras)
     return _stopwords_es
 
 
@@ -59,14 +81,11 @@ def limpiar_texto(texto: str) -> str:
     if not isinstance(texto, str):
         return ""
 
-    texto_limpio = texto.lower()
-    texto_limpio = re.sub(r"http\S+|www\.\S+", " ", texto_limpio)
-    texto_limpio = re.sub(r"[@#]\w+", " ", texto_limpio)
-    texto_limpio = re.sub(r"\d+", " ", texto_limpio)
-    texto_limpio = re.sub(r"[^a-záéíóúñü\s]", " ", texto_limpio)
-    texto_limpio = unidecode(texto_limpio)
-    texto_limpio = re.sub(r"\s+", " ", texto_limpio).strip()
-    return texto_limpio
+    texto_limpio = _RE_RUIDO.sub(" ", texto.lower())
+    # `isascii` es O(1) en CPython: si no quedan tildes se evita recorrer el texto.
+    if not texto_limpio.isascii():
+        texto_limpio = texto_limpio.translate(_TABLA_TILDES)
+    return " ".join(texto_limpio.split())
 
 
 def parsear_fecha_publicacion(fecha_str: str | None) -> datetime | None:
@@ -89,110 +108,180 @@ def _normalizar_grupo_terminos(grupo_terminos: List[str]) -> List[str]:
     return [termino.strip() for termino in grupo_terminos if termino and termino.strip()][:5]
 
 
-def _contar_menciones_termino(texto_limpio: str, termino: str, modo: str) -> int:
-    """Cuenta menciones de un término según el modo de coincidencia elegido."""
+def _delimitar_palabras(palabras: Iterable[str]) -> str:
+    """Une palabras con doble espacio y las rodea de espacios.
+
+    Tras `limpiar_texto` las palabras solo están separadas por un espacio, así
+    que un límite de palabra equivale a un espacio o al borde del texto. Con
+    separadores dobles cada aparición tiene sus propios espacios y `str.count`
+    da las mismas coincidencias (no solapadas) que `re.findall` con `\b`.
+    """
+
+    return " " + "  ".join(palabras) + " "
+
+
+@dataclass(frozen=True)
+class _TerminoPreparado:
+    """Término del grupo con su forma limpia y su frase delimitada precalculadas."""
+
+    termino: str
+    termino_limpio: str
+    palabras: Tuple[str, ...]
+    frase_delimitada: str
+
+
+@lru_cache(maxsize=256)
+def _preparar_termino(termino: str) -> _TerminoPreparado:
+    """Limpia un término una sola vez y prepara su forma para frase exacta."""
 
     termino_limpio = limpiar_texto(termino)
-    if not termino_limpio:
-        return 0
+    palabras = tuple(termino_limpio.split())
+    return _TerminoPreparado(termino, termino_limpio, palabras, _delimitar_palabras(palabras))
 
-    palabras_termino = termino_limpio.split()
-    if not palabras_termino:
-        return 0
 
-    palabras_texto = texto_limpio.split()
+@lru_cache(maxsize=64)
+def _patron_palabras_terminos(terminos: Tuple[_TerminoPreparado, ...]) -> re.Pattern[str] | None:
+    """Compila una alternancia con todas las palabras de los términos del grupo."""
+
+    palabras = sorted({p for termino in terminos for p in termino.palabras}, key=len, reverse=True)
+    if not palabras:
+        return None
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, palabras)) + r")\b")
+
+
+def _contar_menciones_termino(
+    texto_limpio: str,
+    termino: _TerminoPreparado,
+    modo: str,
+    conteos_palabras: CounterType[str] | None = None,
+    texto_delimitado: str | None = None,
+) -> int:
+    """Cuenta menciones de un término según el modo de coincidencia elegido.
+
+    En los modos por palabra se puede pasar `conteos_palabras` ya calculado, y
+    en frase exacta `texto_delimitado`, para no recorrer el texto otra vez por
+    cada término.
+    """
+
+    if not termino.palabras:
+        return 0
 
     if modo == "frase_exacta":
-        patron = r"\b" + re.escape(termino_limpio) + r"\b"
-        return len(re.findall(patron, texto_limpio))
+        if texto_delimitado is None:
+            texto_delimitado = _delimitar_palabras(texto_limpio.split())
+        return texto_delimitado.count(termino.frase_delimitada)
 
-    conteos = Counter(palabras_texto)
+    conteos = conteos_palabras
+    if conteos is None:
+        conteos = Counter(_patron_palabras_terminos((termino,)).findall(texto_limpio))
 
     if modo == "todas_las_palabras":
-        return min(conteos.get(p, 0) for p in palabras_termino)
+        return min(conteos.get(p, 0) for p in termino.palabras)
+
+    return sum(conteos.get(p, 0) for p in termino.palabras)
 
-    return sum(conteos.get(p, 0) for p in palabras_termino)
+
+def _contiene_algun_termino(
+    texto_limpio: str, terminos: List[_TerminoPreparado], modo_coincidencia: str
+) -> bool:
+    """Descarte rápido por subcadena: si es False no puede haber menciones."""
+
+    if modo_coincidencia == "frase_exacta":
+        return any(t.termino_limpio and t.termino_limpio in texto_limpio for t in terminos)
+    return any(p in texto_limpio for t in terminos for p in t.palabras)
 
 
 def _contar_menciones_en_texto(
-    texto_limpio: str, grupo_terminos: List[str], modo_coincidencia: str
+    texto_limpio: str, terminos: List[_TerminoPreparado], modo_coincidencia: str
 ) -> Dict[str, int]:
     """Cuenta menciones por término en un texto ya limpiado."""
 
+    # Un solo recorrido del texto para todos los términos (por palabras o frase delimitada).
+    conteos_palabras: CounterType[str] | None = None
+    texto_delimitado: str | None = None
+    if modo_coincidencia == "frase_exacta":
+        texto_delimitado = " " + texto_limpio.replace(" ", "  ") + " "
+    else:
+        patron = _patron_palabras_terminos(tuple(terminos))
+        conteos_palabras = Counter(patron.findall(texto_limpio)) if patron else Counter()
     conteo: Dict[str, int] = {}
-    for termino in grupo_terminos:
-        conteo[termino] = _contar_menciones_termino(texto_limpio, termino, modo_coincidencia)
+    for termino in terminos:
+        conteo[termino.termino] = _contar_menciones_termino(
+            texto_limpio, termino, modo_coincidencia, conteos_palabras, texto_delimitado
+        )
     return conteo
 
 
-def _puntaje_relevancia(texto_limpio: str, termino: str) -> float:
+def _puntaje_relevancia(palabras_texto: List[str], termino: _TerminoPreparado) -> float:
     """Calcula una similitud sencilla basada en solapamiento de palabras."""
 
-    termino_limpio = limpiar_texto(termino)
-    if not termino_limpio:
+    if not termino.termino_limpio:
         return 0.0
-    palabras_texto = set(texto_limpio.split())
-    palabras_termino = set(termino_limpio.split())
+    palabras_termino = set(termino.palabras)
     if not palabras_texto or not palabras_termino:
         return 0.0
-    interseccion = palabras_texto.intersection(palabras_termino)
+    # Se intersecta contra el conjunto del término, sin armar el vocabulario de la página.
+    interseccion = palabras_termino.intersection(palabras_texto)
     return len(interseccion) / len(palabras_termino)
 
 
 # =========================
 # PALABRAS ASOCIADAS
 # =========================
-def _generar_palabras_limpias(textos: Iterable[str]) -> List[str]:
-    """Convierte textos en una lista de palabras limpias."""
+def _palabras_de_terminos(grupo_terminos: Iterable[str]) -> set[str]:
+    """Palabras limpias de los términos, reutilizando los términos ya preparados."""
+
+    return {p for termino in grupo_terminos for p in _preparar_termino(termino).palabras}
+
+
+def _textos_limpios_relevantes(paginas_df: pd.DataFrame) -> List[str]:
+    """Textos limpios de las páginas con menciones.
 
-    palabras: List[str] = []
-    for texto in textos:
-        texto_limpio = limpiar_texto(texto)
-        if texto_limpio:
-            palabras.extend(texto_limpio.split())
-    return palabras
+    Reutiliza la columna `texto_limpio` que deja `_procesar_resultado`; solo se
+    limpia de nuevo si el DataFrame trae `texto` en su lugar.
+    """
+
+    if "texto_limpio" not in paginas_df.columns and "texto" not in paginas_df.columns:
+        raise ValueError(
+            "Se necesita la columna `texto_limpio` o `texto`; el DataFrame que devuelve "
+            "`analizar_menciones_web` solo trae `texto_preview` y ya incluye las estadísticas."
+        )
+    relevantes = paginas_df.loc[paginas_df["menciones_totales_pagina"] > 0]
+    if "texto_limpio" in relevantes.columns:
+        return relevantes["texto_limpio"].tolist()
+    return [limpiar_texto(texto) for texto in relevantes["texto"]]
 
 
 def contar_palabras_asociadas(
     paginas_df: pd.DataFrame, grupo_terminos: List[str], top_n: int = 30
 ) -> Tuple[pd.DataFrame, CounterType[str]]:
-    """Calcula las palabras asociadas más frecuentes."""
+    """Calcula las palabras asociadas más frecuentes.
+
+    `paginas_df` debe traer `texto_limpio` o `texto` (no sirve el DataFrame ya
+    devuelto por `analizar_menciones_web`); si no, se lanza `ValueError`.
+    """
 
     if paginas_df.empty:
         return pd.DataFrame(columns=["palabra", "frecuencia"]), Counter()
 
-    textos_relevantes = paginas_df.loc[
-        paginas_df["menciones_totales_pagina"] > 0, "texto"
-    ].tolist()
-
-    todas_las_palabras = _generar_palabras_limpias(textos_relevantes)
-
-    stopwords_es = asegurar_stopwords_espanol()
-    palabras_terminos = set()
-    for termino in grupo_terminos:
-        for palabra in limpiar_texto(termino).split():
-            palabra_normalizada = unidecode(palabra.lower())
-            if palabra_normalizada:
-                palabras_terminos.add(palabra_normalizada)
-
-    palabras_filtradas: List[str] = []
-    for palabra in todas_las_palabras:
-        palabra_normalizada = unidecode(palabra.lower())
-        if len(palabra_normalizada) <= 3:
-            continue
-        if palabra_normalizada in stopwords_es:
-            continue
-        if palabra_normalizada in palabras_terminos:
-            continue
-        if palabra_normalizada.isnumeric():
-            continue
-        if palabra_normalizada.startswith("http"):
-            continue
-        if palabra_normalizada in {"amp", "utm", "https", "http"}:
-            continue
-        palabras_filtradas.append(palabra_normalizada)
+    # Recuento página a página: nunca se materializa la lista con todas las palabras.
+    conteo_palabras: CounterType[str] = Counter()
+    for texto_limpio in _textos_limpios_relevantes(paginas_df):
+        conteo_palabras.update(texto_limpio.split())
+
+    palabras_terminos = _palabras_de_terminos(grupo_terminos)
+    # `limpiar_texto` ya quitó números y URLs: basta un único conjunto de exclusión.
+    excluidas = asegurar_stopwords_espanol() | palabras_terminos | _PALABRAS_RUIDO
+
+    # Se cuenta en C y se filtra una vez por palabra distinta, no por aparición.
+    contador: CounterType[str] = Counter(
+        {
+            palabra: frecuencia
+            for palabra, frecuencia in conteo_palabras.items()
+            if len(palabra) > 3 and palabra not in excluidas
+        }
+    )
 
-    contador: CounterType[str] = Counter(palabras_filtradas)
     top_palabras = contador.most_common(top_n)
     df_top_palabras = pd.DataFrame(top_palabras, columns=["palabra", "frecuencia"])
     return df_top_palabras, contador
@@ -201,69 +290,91 @@ def contar_palabras_asociadas(
 def contar_bigramas(
     paginas_df: pd.DataFrame, grupo_terminos: List[str], top_n: int = 20
 ) -> pd.DataFrame:
-    """Calcula los bigramas más frecuentes excluyendo stopwords y términos."""
+    """Calcula los bigramas más frecuentes excluyendo stopwords y términos.
+
+    Igual que `contar_palabras_asociadas`, requiere la columna `texto_limpio` o
+    `texto`; si falta, se lanza `ValueError`.
+    """
 
     if paginas_df.empty:
         return pd.DataFrame(columns=["bigram", "frecuencia"])
 
-    textos_relevantes = paginas_df.loc[
-        paginas_df["menciones_totales_pagina"] > 0, "texto"
-    ].tolist()
-
-    palabras = _generar_palabras_limpias(textos_relevantes)
-    stopwords_es = asegurar_stopwords_espanol()
-    palabras_terminos = set()
-    for termino in grupo_terminos:
-        palabras_terminos.update(limpiar_texto(termino).split())
-
-    palabras_filtradas = [
-        p for p in palabras if p not in stopwords_es and p not in palabras_terminos and len(p) > 2
-    ]
-
-    bigramas = [
-        f"{palabras_filtradas[i]} {palabras_filtradas[i + 1]}" for i in range(len(palabras_filtradas) - 1)
-    ]
-    contador: CounterType[str] = Counter(bigramas)
-    df_top_bigramas = pd.DataFrame(contador.most_common(top_n), columns=["bigram", "frecuencia"])
+    excluidas = asegurar_stopwords_espanol() | _palabras_de_terminos(grupo_terminos)
+
+    # Una pasada por página; `anterior` une el final de una página con la siguiente.
+    contador: CounterType[Tuple[str, str]] = Counter()
+    anterior: str | None = None
+    for texto_limpio in _textos_limpios_relevantes(paginas_df):
+        palabras = [p for p in texto_limpio.split() if len(p) > 2 and p not in excluidas]
+        if not palabras:
+            continue
+        if anterior is not None:
+            contador[(anterior, palabras[0])] += 1
+        contador.update(zip(palabras, islice(palabras, 1, None)))
+        anterior = palabras[-1]
+
+    # Solo se formatean los top_n pares.
+    top_bigramas = [(f"{w1} {w2}", frecuencia) for (w1, w2), frecuencia in contador.most_common(top_n)]
+    df_top_bigramas = pd.DataFrame(top_bigramas, columns=["bigram", "frecuencia"])
     return df_top_bigramas
 
 
 # =========================
 # ORQUESTADOR PRINCIPAL
 # =========================
+def _primeras_palabras_distintas(palabras: Iterable[str], cantidad: int) -> List[str]:
+    """Devuelve las primeras `cantidad` palabras sin repetir, cortando el recorrido al llegar."""
+
+    vistas: set[str] = set()
+    primeras: List[str] = []
+    for palabra in palabras:
+        if palabra not in vistas:
+            vistas.add(palabra)
+            primeras.append(palabra)
+            if len(primeras) == cantidad:
+                break
+    return primeras
+
+
 def _procesar_resultado(
     resultado: ResultadoBusqueda,
-    grupo_terminos: List[str],
+    terminos: List[_TerminoPreparado],
     modo_coincidencia: str,
 ) -> Dict[str, object] | None:
     """Convierte un resultado bruto en registro listo para DataFrame y BD."""
 
     texto_limpio = limpiar_texto(resultado.texto or "")
-    menciones_por_termino = _contar_menciones_en_texto(texto_limpio, grupo_terminos, modo_coincidencia)
+    if not _contiene_algun_termino(texto_limpio, terminos, modo_coincidencia):
+        return None
+
+    menciones_por_termino = _contar_menciones_en_texto(texto_limpio, terminos, modo_coincidencia)
     menciones_totales = sum(menciones_por_termino.values())
     if menciones_totales == 0:
         return None
 
-    termino_principal = max(menciones_por_termino, key=menciones_por_termino.get)
-    puntaje = _puntaje_relevancia(texto_limpio, termino_principal)
+    # Una sola tokenización por página, compartida por el puntaje y las palabras clave.
+    palabras_texto = texto_limpio.split()
+    termino_principal = max(terminos, key=lambda t: menciones_por_termino[t.termino])
+    puntaje = _puntaje_relevancia(palabras_texto, termino_principal)
 
     registro: Dict[str, object] = {
         "titulo": resultado.titulo,
         "url": resultado.url,
-        "dominio": resultado.dominio or urlparse(resultado.url).netloc,
+        "dominio": resultado.dominio or extraer_dominio(resultado.url),
         "texto": resultado.texto,
+        "texto_limpio": texto_limpio,
         "fecha_publicacion": resultado.fecha_publicacion,
         "menciones_totales_pagina": menciones_totales,
         "menciones_por_termino": menciones_por_termino,
-        "termino_encontrado": termino_principal,
+        "termino_encontrado": termino_principal.termino,
         "puntaje_relevancia": puntaje,
         "profundidad": resultado.profundidad,
         "canonico": resultado.canonica or resultado.url,
-        "palabras_clave_asociadas": ", ".join(list(Counter(texto_limpio.split()).keys())[:5]),
+        "palabras_clave_asociadas": ", ".join(_primeras_palabras_distintas(palabras_texto, 5)),
     }
 
-    for idx, termino in enumerate(grupo_terminos, start=1):
-        registro[f"menciones_termino_{idx}"] = menciones_por_termino.get(termino, 0)
+    for idx, termino in enumerate(terminos, start=1):
+        registro[f"menciones_termino_{idx}"] = menciones_por_termino.get(termino.termino, 0)
 
     return registro
 
@@ -278,13 +389,14 @@ def analizar_menciones_web(
     top_n_palabras: int = 30,
     incluir_paginas_sin_fecha: bool = True,
     crawl_extendido: bool = False,
-) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
-    """Ejecuta la búsqueda web y devuelve páginas, top palabras y estadísticas."""
+    top_n_bigramas: int = 15,
+) -> Tuple[pd.DataFrame, pd.DataFrame, dict, pd.DataFrame]:
+    """Ejecuta la búsqueda web y devuelve páginas, top palabras, estadísticas y top bigramas."""
 
     inicializar_bd()
     grupo_terminos = _normalizar_grupo_terminos(grupo_terminos)
     if not grupo_terminos:
-        return pd.DataFrame(), pd.DataFrame(), {}
+        return pd.DataFrame(), pd.DataFrame(), {}, pd.DataFrame()
 
     modo = modo_coincidencia if modo_coincidencia in MODOS_COINCIDENCIA_VALIDOS else "frase_exacta"
 
@@ -296,9 +408,13 @@ def analizar_menciones_web(
         crawl_extendido=crawl_extendido,
     )
 
-    registros: List[Dict[str, object]] = []
+    # Los términos se limpian y delimitan una sola vez para toda la ejecución.
+    terminos = [_preparar_termino(termino) for termino in grupo_terminos]
+
+    # Una lista por columna: el DataFrame se arma de una vez, sin un dict por fila.
+    columnas: Dict[str, List[object]] = {}
     for resultado in resultados_web:
-        registro = _procesar_resultado(resultado, grupo_terminos, modo)
+        registro = _procesar_resultado(resultado, terminos, modo)
         if not registro:
             continue
 
@@ -309,13 +425,38 @@ def analizar_menciones_web(
         else:
             registro["fecha_publicacion"] = "sin_fecha"
 
-        pagina_id = guardar_pagina(
-            registro["url"], registro["titulo"], registro["texto"], fecha_publicacion_dt
+        for columna, valor in registro.items():
+            columnas.setdefault(columna, []).append(valor)
+
+    # Persistencia en bloque: una sola transacción para todas las páginas.
+    if columnas:
+        guardar_paginas_con_menciones(
+            zip(
+                columnas["url"],
+                columnas["titulo"],
+                columnas["texto"],
+                columnas["fecha_publicacion_dt"],
+                columnas["menciones_por_termino"],
+            )
         )
-        registrar_menciones(pagina_id, registro["menciones_por_termino"])
-        registros.append(registro)
+        # El texto completo ya quedó en la BD: el DataFrame solo lleva un extracto.
+        columnas["texto_preview"] = [
+            (texto or "")[:_LARGO_EXTRACTO_TEXTO] for texto in columnas.pop("texto")
+        ]
+
+    # Tipos explícitos: conteos en int32, metadatos cortos en Arrow y `dominio` como categoría.
+    tipos_columnas = {
+        "menciones_totales_pagina": "int32",
+        **{f"menciones_termino_{idx}": "int32" for idx in range(1, len(terminos) + 1)},
+        "titulo": _DTYPE_CADENAS,
+        "url": _DTYPE_CADENAS,
+        "dominio": "category",
+    }
+    for columna, tipo in tipos_columnas.items():
+        if columna in columnas:
+            columnas[columna] = pd.Series(columnas[columna], dtype=tipo)
 
-    df_paginas = pd.DataFrame(registros)
+    df_paginas = pd.DataFrame(columnas)
     if df_paginas.empty:
         resumen = {
             "terminos": grupo_terminos,
@@ -339,70 +480,81 @@ def analizar_menciones_web(
             "fecha_mas_antigua": "sin_fecha",
             "fecha_mas_reciente": "sin_fecha",
         }
-        return df_paginas, pd.DataFrame(columns=["palabra", "frecuencia"]), resumen
+        return (
+            df_paginas,
+            pd.DataFrame(columns=["palabra", "frecuencia"]),
+            resumen,
+            pd.DataFrame(columns=["bigram", "frecuencia"]),
+        )
 
+    # Con el formato explícito pandas usa su parser rápido y "sin_fecha" queda como NaT.
     df_paginas["fecha_publicacion_dt"] = pd.to_datetime(
-        df_paginas.get("fecha_publicacion"), errors="coerce"
+        df_paginas["fecha_publicacion"], format="%Y-%m-%d", errors="coerce"
     )
 
     total_antes_filtro = len(df_paginas)
     fecha_desde_dt = pd.to_datetime(fecha_desde) if fecha_desde else None
     fecha_hasta_dt = pd.to_datetime(fecha_hasta) if fecha_hasta else None
 
-    mask_known = df_paginas["fecha_publicacion_dt"].notna()
-    mask_rango = mask_known
+    # Máscara de faltantes reutilizada; las comparaciones con NaT dan False.
+    fechas = df_paginas["fecha_publicacion_dt"]
+    sin_fecha = fechas.isna()
+    mask_rango = ~sin_fecha
     if fecha_desde_dt is not None:
-        mask_rango &= df_paginas["fecha_publicacion_dt"] >= fecha_desde_dt
+        mask_rango &= fechas >= fecha_desde_dt
     if fecha_hasta_dt is not None:
-        mask_rango &= df_paginas["fecha_publicacion_dt"] <= fecha_hasta_dt
+        mask_rango &= fechas <= fecha_hasta_dt
 
     paginas_en_rango = int(mask_rango.sum())
+    mask_final = mask_rango | sin_fecha if incluir_paginas_sin_fecha else mask_rango
 
-    if incluir_paginas_sin_fecha:
-        mask_final = mask_rango | df_paginas["fecha_publicacion_dt"].isna()
-    else:
-        mask_final = mask_rango
-
-    df_paginas = df_paginas.loc[mask_final]
+    # Filtro y orden en una sola selección: el DataFrame se copia una vez.
+    orden = (
+        df_paginas.loc[mask_final, "menciones_totales_pagina"]
+        .sort_values(ascending=False)
+        .index
+    )
+    df_paginas = df_paginas.loc[orden]
+    # Sin las categorías de dominios que quedaron fuera del filtro (conteo 0).
+    df_paginas["dominio"] = df_paginas["dominio"].cat.remove_unused_categories()
     df_paginas["fecha_publicacion"] = df_paginas["fecha_publicacion_dt"].dt.date.astype(
         "string"
     )
     df_paginas.loc[df_paginas["fecha_publicacion"].isna(), "fecha_publicacion"] = "Desconocida"
 
-    paginas_sin_fecha = int(df_paginas["fecha_publicacion_dt"].isna().sum())
     paginas_despues_filtro = len(df_paginas)
     paginas_excluidas = int(total_antes_filtro - paginas_despues_filtro)
 
-    fecha_min = (
-        df_paginas["fecha_publicacion_dt"].min().date().isoformat()
-        if df_paginas["fecha_publicacion_dt"].notna().any()
-        else "sin_fecha"
-    )
-    fecha_max = (
-        df_paginas["fecha_publicacion_dt"].max().date().isoformat()
-        if df_paginas["fecha_publicacion_dt"].notna().any()
-        else "sin_fecha"
-    )
-
-    df_paginas = df_paginas.sort_values(by="menciones_totales_pagina", ascending=False)
+    # Tras el filtro, las fechas conocidas son exactamente las del rango.
+    fechas_conocidas = fechas[mask_rango]
+    paginas_sin_fecha = paginas_despues_filtro - paginas_en_rango
+    if fechas_conocidas.empty:
+        fecha_min = fecha_max = "sin_fecha"
+    else:
+        fecha_min = fechas_conocidas.min().date().isoformat()
+        fecha_max = fechas_conocidas.max().date().isoformat()
 
     df_top_palabras, _ = contar_palabras_asociadas(df_paginas, grupo_terminos, top_n=top_n_palabras)
+    df_top_bigramas = contar_bigramas(df_paginas, grupo_terminos, top_n=top_n_bigramas)
+    # `texto_limpio` solo sirve para las estadísticas de texto: no se devuelve.
+    del df_paginas["texto_limpio"]
+
+    # Todas las sumas de menciones (por término y total) en una sola operación.
+    columnas_terminos = [f"menciones_termino_{idx}" for idx in range(1, len(grupo_terminos) + 1)]
+    sumas = df_paginas[[*columnas_terminos, "menciones_totales_pagina"]].sum()
+    menciones_por_termino_total: Dict[str, int] = {
+        termino: int(sumas[columna]) for termino, columna in zip(grupo_terminos, columnas_terminos)
+    }
 
-    menciones_por_termino_total: Dict[str, int] = {}
-    for idx, termino in enumerate(grupo_terminos, start=1):
-        columna = f"menciones_termino_{idx}"
-        if columna in df_paginas.columns:
-            menciones_por_termino_total[termino] = int(df_paginas[columna].sum())
-        else:
-            menciones_por_termino_total[termino] = 0
-
-    paginas_con_menciones = int((df_paginas["menciones_totales_pagina"] > 0).sum())
-    menciones_totales_grupo = int(df_paginas["menciones_totales_pagina"].sum())
+    # `_procesar_resultado` descarta las páginas sin menciones: toda fila cuenta.
+    paginas_con_menciones = len(df_paginas)
+    menciones_totales_grupo = int(sumas["menciones_totales_pagina"])
     promedio = menciones_totales_grupo / paginas_con_menciones if paginas_con_menciones > 0 else 0
 
-    dominios_top = (
-        df_paginas.groupby("dominio")["url"].count().sort_values(ascending=False).head(10).to_dict()
-    )
+    dominios_top = {
+        dominio: int(cantidad)
+        for dominio, cantidad in df_paginas["dominio"].value_counts().head(10).items()
+    }
 
     resumen = {
         "terminos": grupo_terminos,
@@ -431,4 +583,4 @@ def analizar_menciones_web(
         "incluye_paginas_sin_fecha": incluir_paginas_sin_fecha,
     }
 
-    return df_paginas, df_top_palabras, resumen
+    return df_paginas, df_top_palabras, resumen, df_top_bigramas
@@ -11,39 +11,96 @@ Dependencias principales:
     - beautifulsoup4
     - pandas
     - nltk
-    - unidecode
 
 """
 
+import json
 import re
+import sqlite3
+import threading
+import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import nltk
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from ddgs import DDGS
 from nltk.corpus import stopwords
-from unidecode import unidecode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Descargas simultáneas de páginas (la carga está dominada por la red).
+MAX_DESCARGAS_CONCURRENTES = 16
+# Bytes máximos que se leen de cada página; el resto del cuerpo se descarta.
+MAX_BYTES_PAGINA = 1_048_576
+TIPOS_CONTENIDO_HTML = ("text/html", "application/xhtml+xml")
+
+# Caché en disco de los textos descargados: dentro del plazo se revalida con
+# ETag/Last-Modified (un 304 no trae cuerpo) o se sirve sin tocar la red.
+RUTA_CACHE_PAGINAS = ".cache_paginas.sqlite"
+CACHE_TTL_SEGUNDOS = 7 * 24 * 3600
+# Los resultados de DuckDuckGo cambian más seguido: se reutilizan durante un día.
+CACHE_BUSQUEDAS_TTL_SEGUNDOS = 24 * 3600
+
+# Cabeceras comunes a todas las descargas (se construyen una sola vez).
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Parser HTML: lxml (C) si está instalado; si no, el parser puro Python.
+try:
+    import lxml  # noqa: F401
+
+    PARSER_HTML = "lxml"
+except ImportError:
+    PARSER_HTML = "html.parser"
+
+_SOLO_PARRAFOS = SoupStrainer("p")
+
+# Ruido a eliminar (URLs, menciones/hashtags y todo lo que no sea letra, números
+# incluidos) en una sola pasada; compilado una vez al importar el módulo.
+_RE_RUIDO = re.compile(r"http\S+|www\.\S+|[@#]\w+|[^a-záéíóúñü\s]")
+# Tras la limpieza solo quedan estas letras acentuadas; basta una tabla fija.
+_TABLA_TILDES = str.maketrans("áéíóúñü", "aeiounu")
+# Palabras de tres letras o más del texto ya limpio (solo quedan a-z y espacios).
+_RE_PALABRA_LARGA = re.compile(r"[a-z]{3,}")
+
+_stopwords_es: frozenset[str] | None = None
+
+_cache_conexion: sqlite3.Connection | None = None
+_cache_lock = threading.Lock()
 
 
 # =========================
 # UTILIDADES NLTK
 # =========================
-def asegurar_stopwords_espanol() -> List[str]:
-    """Devuelve las stopwords en español, descargándolas si es necesario."""
+def asegurar_stopwords_espanol() -> frozenset[str]:
+    """Devuelve las stopwords en español sin tildes, descargándolas si es necesario.
+
+    El corpus de NLTK se lee una sola vez; las llamadas siguientes reutilizan el
+    conjunto ya construido.
+    """
+
+    global _stopwords_es
+    if _stopwords_es is not None:
+        return _stopwords_es
 
     try:
-        return stopwords.words("spanish")
+        palabras = stopwords.words("spanish")
     except LookupError:
         print("Descargando stopwords de NLTK en español...")
         nltk.download("stopwords")
-        return stopwords.words("spanish")
+        palabras = stopwords.words("spanish")
     except Exception as exc:
         print(f"No se pudieron cargar las stopwords: {exc}")
-        return []
+        palabras = []
+
+    # Se normalizan igual que las palabras de `limpiar_texto` (sin tildes).
+    _stopwords_es = frozenset(p.lower().translate(_TABLA_TILDES) for p in palabras)
+    return _stopwords_es
 
 
 # =========================
@@ -55,69 +112,266 @@ def limpiar_texto(texto: str) -> str:
     if not isinstance(texto, str):
         return ""
 
-    texto_limpio = texto.lower()
-    texto_limpio = re.sub(r"http\S+|www\.\S+", " ", texto_limpio)
-    texto_limpio = re.sub(r"[@#]\w+", " ", texto_limpio)
-    texto_limpio = re.sub(r"\d+", " ", texto_limpio)
-    texto_limpio = re.sub(r"[^a-záéíóúñü\s]", " ", texto_limpio)
-    texto_limpio = unidecode(texto_limpio)
-    texto_limpio = re.sub(r"\s+", " ", texto_limpio).strip()
-    return texto_limpio
+    texto_limpio = _RE_RUIDO.sub(" ", texto.lower())
+    # `isascii` es O(1) en CPython: si no quedan tildes se evita recorrer el texto.
+    if not texto_limpio.isascii():
+        texto_limpio = texto_limpio.translate(_TABLA_TILDES)
+    return " ".join(texto_limpio.split())
 
 
 # =========================
 # BÚSQUEDA EN LA WEB
 # =========================
-def extraer_texto_de_url(url: str, timeout: int = 10) -> str:
+def crear_sesion_http() -> requests.Session:
+    """Crea una sesión HTTP con pool de conexiones y reintentos cortos."""
+
+    sesion = requests.Session()
+    sesion.headers.update(_HEADERS)
+    adaptador = HTTPAdapter(
+        pool_connections=MAX_DESCARGAS_CONCURRENTES * 2,
+        pool_maxsize=MAX_DESCARGAS_CONCURRENTES * 2,
+        # Solo se reintentan errores de conexión/lectura; nunca se espera un Retry-After.
+        max_retries=Retry(
+            total=2, status=0, backoff_factor=0.2, respect_retry_after_header=False
+        ),
+    )
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+# Sesión compartida por el módulo: las conexiones keep-alive (y sus handshakes
+# TLS) se reutilizan entre descargas y entre búsquedas.
+_SESSION = crear_sesion_http()
+
+
+def _conexion_cache() -> sqlite3.Connection:
+    """Abre (una sola vez) la base SQLite de la caché de páginas y búsquedas."""
+
+    global _cache_conexion
+    if _cache_conexion is None:
+        _cache_conexion = sqlite3.connect(RUTA_CACHE_PAGINAS, check_same_thread=False)
+        _cache_conexion.execute(
+            "CREATE TABLE IF NOT EXISTS paginas ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "texto TEXT NOT NULL, guardado REAL NOT NULL)"
+        )
+        _cache_conexion.execute(
+            "CREATE TABLE IF NOT EXISTS busquedas ("
+            "termino TEXT NOT NULL, max_resultados INTEGER NOT NULL, "
+            "candidatos TEXT NOT NULL, guardado REAL NOT NULL, "
+            "PRIMARY KEY (termino, max_resultados))"
+        )
+    return _cache_conexion
+
+
+def _leer_cache(url: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+    """Devuelve (etag, last_modified, texto) si la URL está en caché y no venció."""
+
+    try:
+        with _cache_lock:
+            return _conexion_cache().execute(
+                "SELECT etag, last_modified, texto FROM paginas WHERE url = ? AND guardado >= ?",
+                (url, time.time() - CACHE_TTL_SEGUNDOS),
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+
+
+def _guardar_cache(url: str, etag: Optional[str], last_modified: Optional[str], texto: str) -> None:
+    """Guarda o renueva el texto de una URL en la caché."""
+
+    try:
+        with _cache_lock:
+            conexion = _conexion_cache()
+            with conexion:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, texto, time.time()),
+                )
+    except sqlite3.Error as exc:
+        print(f"No se pudo guardar {url} en la caché: {exc}")
+
+
+def _leer_busqueda_cache(termino: str, max_resultados: int) -> Optional[List[Tuple[str, str, str]]]:
+    """Devuelve los candidatos (url, título, fecha) de una búsqueda reciente, si existe."""
+
+    try:
+        with _cache_lock:
+            fila = _conexion_cache().execute(
+                "SELECT candidatos FROM busquedas "
+                "WHERE termino = ? AND max_resultados = ? AND guardado >= ?",
+                (termino, max_resultados, time.time() - CACHE_BUSQUEDAS_TTL_SEGUNDOS),
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    return [tuple(candidato) for candidato in json.loads(fila[0])] if fila else None
+
+
+def _guardar_busqueda_cache(termino: str, max_resultados: int, candidatos: List[Tuple[str, str, str]]) -> None:
+    """Guarda o renueva los candidatos de una búsqueda en la caché."""
+
+    try:
+        with _cache_lock:
+            conexion = _conexion_cache()
+            with conexion:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO busquedas VALUES (?, ?, ?, ?)",
+                    (termino, max_resultados, json.dumps(candidatos), time.time()),
+                )
+    except sqlite3.Error as exc:
+        print(f"No se pudo guardar la búsqueda en la caché: {exc}")
+
+
+def _recortar_utf8_incompleto(contenido: bytes) -> bytes:
+    """Quita un carácter UTF-8 partido al final por el límite de tamaño.
+
+    Con la secuencia cortada la decodificación UTF-8 falla y BeautifulSoup cae a
+    windows-1252, lo que corrompe las tildes de toda la página.
+    """
+
+    for atras in range(1, min(4, len(contenido)) + 1):
+        byte = contenido[-atras]
+        if byte < 0x80:
+            return contenido
+        if byte >= 0xC0:
+            largo = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return contenido[:-atras] if largo > atras else contenido
+    return contenido
+
+
+def extraer_texto_de_url(
+    url: str, timeout: int = 10, session: Optional[requests.Session] = None
+) -> str:
     """Descarga una URL y concatena los párrafos principales."""
 
+    cliente = session or _SESSION
+    # El User-Agent va en la sesión; por llamada solo viajan las cabeceras condicionales.
+    cabeceras = {}
+    en_cache = _leer_cache(url)
+    if en_cache:
+        etag, last_modified, texto_cache = en_cache
+        if not etag and not last_modified:
+            return texto_cache
+        if etag:
+            cabeceras["If-None-Match"] = etag
+        if last_modified:
+            cabeceras["If-Modified-Since"] = last_modified
     try:
-        respuesta = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-        if respuesta.status_code != 200:
-            return ""
-        soup = BeautifulSoup(respuesta.text, "html.parser")
+        # Con stream=True las respuestas que no son HTML se descartan sin bajar el cuerpo.
+        with cliente.get(url, timeout=timeout, headers=cabeceras, stream=True) as respuesta:
+            if respuesta.status_code == 304 and en_cache:
+                return en_cache[2]
+            if respuesta.status_code != 200:
+                return ""
+            tipo = respuesta.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+            if tipo and tipo not in TIPOS_CONTENIDO_HTML:
+                return ""
+            contenido = bytearray()
+            for bloque in respuesta.iter_content(chunk_size=65536):
+                contenido += bloque
+                if len(contenido) >= MAX_BYTES_PAGINA:
+                    break
+            # Bytes al parser: sin charset declarado, la codificación sale del <meta> del HTML.
+            declara_charset = "charset" in respuesta.headers.get("Content-Type", "").lower()
+            codificacion = respuesta.encoding if declara_charset else None
+        html = bytes(contenido[:MAX_BYTES_PAGINA])
+        if len(contenido) >= MAX_BYTES_PAGINA:
+            html = _recortar_utf8_incompleto(html)
+        # Solo se construye el árbol de los <p>.
+        soup = BeautifulSoup(
+            html,
+            PARSER_HTML,
+            parse_only=_SOLO_PARRAFOS,
+            from_encoding=codificacion,
+        )
         parrafos = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-        return " ".join(parrafos)
+        texto = " ".join(parrafos)
+        _guardar_cache(
+            url, respuesta.headers.get("ETag"), respuesta.headers.get("Last-Modified"), texto
+        )
+        return texto
     except Exception as exc:
         print(f"No se pudo procesar {url}: {exc}")
         return ""
 
 
+def _clave_url(url: str) -> str:
+    """Normaliza una URL para detectar duplicados: host en minúsculas, sin fragmento ni utm_*."""
+
+    partes = urlsplit(url)
+    consulta = partes.query
+    if "utm_" in consulta:
+        parametros = parse_qsl(consulta, keep_blank_values=True)
+        consulta = urlencode([(k, v) for k, v in parametros if not k.lower().startswith("utm_")])
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), partes.path or "/", consulta, ""))
+
+
 def buscar_en_web(termino: str, fecha_desde: str, fecha_hasta: str, max_resultados_web: int) -> pd.DataFrame:
     """Busca el término en la web con DuckDuckGo y devuelve un DataFrame con las páginas válidas."""
 
-    resultados = []
     termino_patron = re.compile(re.escape(termino), flags=re.IGNORECASE)
 
-    with DDGS() as buscador:
-        # ddgs no filtra fechas de forma nativa; el rango es aproximado
-        for resultado in buscador.text(keywords=termino, max_results=max_resultados_web):
-            url = resultado.get("href") or resultado.get("url")
-            if not url:
-                continue
-            titulo = resultado.get("title") or ""
-            fecha = resultado.get("date") or ""
-
-            texto = extraer_texto_de_url(url)
+    # Una lista por columna: el DataFrame se arma sin un diccionario por fila.
+    titulos: List[str] = []
+    urls: List[str] = []
+    fechas: List[str] = []
+    textos_validos: List[str] = []
+    num_menciones: List[int] = []
+
+    # Cada descarga se encola apenas DDG entrega la URL, en el orden de los resultados.
+    with ThreadPoolExecutor(max_workers=MAX_DESCARGAS_CONCURRENTES) as executor:
+        # La consulta no depende del rango de fechas: se reutiliza dentro del día.
+        candidatos = _leer_busqueda_cache(termino, max_resultados_web)
+        if candidatos is not None:
+            descargas = [executor.submit(extraer_texto_de_url, url) for url, _, _ in candidatos]
+        else:
+            candidatos = []
+            descargas = []
+            urls_vistas: set[str] = set()
+            with DDGS() as buscador:
+                # ddgs no filtra fechas de forma nativa; el rango es aproximado
+                for resultado in buscador.text(keywords=termino, max_results=max_resultados_web):
+                    url = resultado.get("href") or resultado.get("url")
+                    if not url:
+                        continue
+                    # Las URLs repetidas (también con otro fragmento o utm_*) se descargan una vez.
+                    clave = _clave_url(url)
+                    if clave in urls_vistas:
+                        continue
+                    urls_vistas.add(clave)
+                    titulo = resultado.get("title") or ""
+                    fecha = resultado.get("date") or ""
+                    candidatos.append((url, titulo, fecha))
+                    descargas.append(executor.submit(extraer_texto_de_url, url))
+            if candidatos:
+                _guardar_busqueda_cache(termino, max_resultados_web, candidatos)
+
+        for (url, titulo, fecha), descarga in zip(candidatos, descargas):
+            texto = descarga.result()
             if not texto:
                 continue
 
-            if not termino_patron.search(texto):
+            menciones = len(termino_patron.findall(texto))
+            if not menciones:
                 continue
 
-            num_menciones = len(re.findall(termino_patron, texto))
-            resultados.append(
-                {
-                    "fuente": "web",
-                    "titulo": titulo,
-                    "url": url,
-                    "fecha": fecha,
-                    "texto": texto,
-                    "num_menciones_termino": num_menciones,
-                }
-            )
+            titulos.append(titulo)
+            urls.append(url)
+            fechas.append(fecha)
+            textos_validos.append(texto)
+            num_menciones.append(menciones)
 
-    return pd.DataFrame(resultados)
+    return pd.DataFrame(
+        {
+            "fuente": ["web"] * len(urls),
+            "titulo": titulos,
+            "url": urls,
+            "fecha": fechas,
+            "texto": textos_validos,
+            "num_menciones_termino": num_menciones,
+        }
+    )
 
 
 # =========================
@@ -126,24 +380,23 @@ def buscar_en_web(termino: str, fecha_desde: str, fecha_hasta: str, max_resultad
 def contar_palabras_frecuentes(df: pd.DataFrame, termino: str, top_n: int = 30) -> Tuple[List[Tuple[str, int]], Counter]:
     """Calcula las palabras más frecuentes excluyendo stopwords, el término buscado y palabras cortas."""
 
-    stopwords_es = set(asegurar_stopwords_espanol())
+    stopwords_es = asegurar_stopwords_espanol()
     palabras_termino = set(limpiar_texto(termino).split())
 
-    todas_las_palabras: List[str] = []
-    for texto in df.get("texto", []):
-        texto_limpio = limpiar_texto(texto)
-        if not texto_limpio:
-            continue
-        for palabra in texto_limpio.split():
-            if palabra in stopwords_es:
-                continue
-            if palabra in palabras_termino:
-                continue
-            if len(palabra) <= 2:
-                continue
-            todas_las_palabras.append(palabra)
-
-    contador = Counter(todas_las_palabras)
+    # Conteo por página con Counter; los filtros se aplican una vez por palabra distinta.
+    conteo_palabras: Counter = Counter()
+    # Se recorre el arreglo subyacente, sin el iterador de la Serie fila por fila.
+    textos = df["texto"].to_numpy() if "texto" in df.columns else ()
+    for texto in textos:
+        conteo_palabras.update(_RE_PALABRA_LARGA.findall(limpiar_texto(texto)))
+
+    contador = Counter(
+        {
+            palabra: frecuencia
+            for palabra, frecuencia in conteo_palabras.items()
+            if palabra not in stopwords_es and palabra not in palabras_termino
+        }
+    )
     top_palabras = contador.most_common(top_n)
     return top_palabras, contador
 
@@ -158,6 +411,16 @@ def buscar_en_redes(termino: str, fecha_desde: str, fecha_hasta: str, max_result
     return pd.DataFrame(columns=["fuente", "titulo", "url", "fecha", "texto", "num_menciones_termino"])
 
 
+# =========================
+# GUARDADO DE RESULTADOS
+# =========================
+def guardar_csv(df: pd.DataFrame, ruta: str) -> None:
+    """Guarda el DataFrame como CSV UTF-8 sin índice, con un búfer de escritura de 1 MiB."""
+
+    with open(ruta, "wb", buffering=1 << 20) as archivo:
+        df.to_csv(archivo, index=False, encoding="utf-8")
+
+
 # =========================
 # FUNCIÓN PRINCIPAL
 # =========================
@@ -194,7 +457,7 @@ def main() -> None:
         print("No se obtuvieron resultados web para el término y rango de fechas especificados.")
         return
 
-    df_web.to_csv("paginas_web.csv", index=False, encoding="utf-8")
+    guardar_csv(df_web, "paginas_web.csv")
     print(f"Se guardaron {len(df_web)} páginas en 'paginas_web.csv'.")
 
     print("\nProcesando textos y calculando frecuencias...")
@@ -212,9 +475,8 @@ def main() -> None:
     for palabra, frecuencia in top_palabras:
         print(f"{palabra}: {frecuencia}")
 
-    df_freq = pd.DataFrame(list(contador_completo.items()), columns=["palabra", "frecuencia"])
-    df_freq = df_freq.sort_values(by="frecuencia", ascending=False)
-    df_freq.to_csv("frecuencias_palabras.csv", index=False, encoding="utf-8")
+    df_freq = pd.DataFrame(contador_completo.most_common(), columns=["palabra", "frecuencia"])
+    guardar_csv(df_freq, "frecuencias_palabras.csv")
     print("Frecuencias guardadas en 'frecuencias_palabras.csv'.")
 
     print("\nAnálisis completado.")
@@ -12,7 +12,6 @@ try:
     from analisis_core import (
         PROFUNDIDAD_OPCIONES,
         analizar_menciones_web,
-        contar_bigramas,
     )
 except ModuleNotFoundError as exc:
     st.set_page_config(page_title="Monitoreo de menciones", layout="wide")
@@ -30,6 +29,41 @@ MODO_COINCIDENCIA_UI = {
     "Cualquiera": "cualquiera",
 }
 
+# Tiempo durante el cual un análisis con los mismos parámetros se reutiliza.
+CACHE_ANALISIS_TTL_SEGUNDOS = 3600
+# Análisis distintos que se guardan a la vez; los más antiguos se descartan.
+CACHE_ANALISIS_MAX_ENTRADAS = 16
+
+
+@st.cache_data(
+    ttl=CACHE_ANALISIS_TTL_SEGUNDOS, max_entries=CACHE_ANALISIS_MAX_ENTRADAS, show_spinner=False
+)
+def _analizar_cacheado(
+    grupo_terminos: tuple[str, ...],
+    fecha_desde: str,
+    fecha_hasta: str,
+    profundidad: int,
+    modo_coincidencia: str,
+    dominio_filtro: str | None,
+    incluir_paginas_sin_fecha: bool,
+    top_n_palabras: int,
+    crawl_extendido: bool,
+) -> tuple[pd.DataFrame, pd.DataFrame, dict, pd.DataFrame]:
+    """Ejecuta el análisis; repetir la consulta no vuelve a descargar páginas."""
+
+    return analizar_menciones_web(
+        grupo_terminos=list(grupo_terminos),
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        profundidad=profundidad,
+        modo_coincidencia=modo_coincidencia,
+        dominio_filtro=dominio_filtro,
+        incluir_paginas_sin_fecha=incluir_paginas_sin_fecha,
+        top_n_palabras=top_n_palabras,
+        crawl_extendido=crawl_extendido,
+        top_n_bigramas=15,
+    )
+
 
 def _generar_pdf_simple(resumen: dict, df_paginas: pd.DataFrame) -> io.BytesIO:
     """Genera un PDF básico con fpdf si está disponible; si no, devuelve texto plano."""
@@ -87,10 +121,9 @@ def _mostrar_kpis(resumen: dict):
 
 
 def _mostrar_detalle_resumen(resumen: dict):
+    # Cada bloque de texto sale en un único `st.markdown`: un elemento por bloque, no por línea.
     st.markdown(
-        f"**Plazo analizado:** {resumen.get('fecha_desde')} a {resumen.get('fecha_hasta')}"
-    )
-    st.markdown(
+        f"**Plazo analizado:** {resumen.get('fecha_desde')} a {resumen.get('fecha_hasta')}\n\n"
         f"**Páginas antes del filtro por fecha:** {resumen.get('paginas_antes_filtro_fecha', 0)}"
         f" | **Después del filtro:** {resumen.get('paginas_despues_filtro_fecha', 0)}"
     )
@@ -102,23 +135,18 @@ def _mostrar_detalle_resumen(resumen: dict):
         st.warning(
             f"{resumen.get('paginas_excluidas_por_fecha')} páginas quedaron fuera del rango por fecha de publicación."
         )
-    st.markdown(
+    partes = [
         f"**Fecha más antigua:** {resumen.get('fecha_mas_antigua')} | "
-        f"**Más reciente:** {resumen.get('fecha_mas_reciente')}"
-    )
-    st.markdown(
-        "**Términos analizados:** " + ", ".join([f"`{t}`" for t in resumen.get("terminos", [])])
-    )
-    st.markdown(
+        f"**Más reciente:** {resumen.get('fecha_mas_reciente')}",
+        "**Términos analizados:** " + ", ".join(f"`{t}`" for t in resumen.get("terminos", [])),
         "**Menciones por término:**\n" + "\n".join(
-            [f"• {t}: {v}" for t, v in resumen.get("menciones_por_termino", {}).items()]
-        )
-    )
-    st.markdown(
+            f"• {t}: {v}" for t, v in resumen.get("menciones_por_termino", {}).items()
+        ),
         f"**Modo de coincidencia:** {resumen.get('modo_coincidencia')}  "
         f"**Dominio filtrado:** {resumen.get('dominio_filtro') or 'Sin filtro'}  "
-        f"**Profundidad:** {resumen.get('profundidad')} ({resumen.get('max_resultados_muestra')} resultados)"
-    )
+        f"**Profundidad:** {resumen.get('profundidad')} ({resumen.get('max_resultados_muestra')} resultados)",
+    ]
+    st.markdown("\n\n".join(partes))
     st.caption(
         "Se analiza una muestra de resultados iniciales devueltos por DuckDuckGo. "
         "No pretende cubrir la web completa."
@@ -138,10 +166,9 @@ def _mostrar_tabla_paginas(df_paginas: pd.DataFrame):
         "menciones_totales_pagina",
         *columnas_menciones,
     ]
-    df_para_tabla = df_paginas[columnas].copy()
-    df_para_tabla["fecha_publicacion"] = df_para_tabla["fecha_publicacion"].fillna("Desconocida")
+    # analizar_menciones_web ya marca las fechas faltantes: basta la proyección.
     st.dataframe(
-        df_para_tabla,
+        df_paginas[columnas],
         use_container_width=True,
         column_config={"url": st.column_config.LinkColumn("URL")},
     )
@@ -231,8 +258,8 @@ else:
         fecha_desde_str, fecha_hasta_str = fecha_desde.isoformat(), fecha_hasta.isoformat()
 
         with st.spinner("Buscando y analizando páginas web en la muestra seleccionada..."):
-            df_paginas, df_top_palabras, resumen = analizar_menciones_web(
-                grupo_terminos=grupo_terminos,
+            df_paginas, df_top_palabras, resumen, df_top_bigramas = _analizar_cacheado(
+                grupo_terminos=tuple(grupo_terminos),
                 fecha_desde=fecha_desde_str,
                 fecha_hasta=fecha_hasta_str,
                 profundidad=profundidad,
@@ -242,7 +269,6 @@ else:
                 top_n_palabras=top_n_palabras,
                 crawl_extendido=crawl_extendido,
             )
-            df_top_bigramas = contar_bigramas(df_paginas, grupo_terminos, top_n=15)
 
         if df_paginas.empty:
             st.warning(
@@ -315,10 +341,15 @@ else:
                 df_filtrado = _filtros_tab_paginas(df_paginas)
                 _mostrar_tabla_paginas(df_filtrado)
 
-                csv_paginas = df_filtrado.to_csv(index=False).encode("utf-8")
+                # El CSV se escribe directo en bytes, sin una cadena intermedia.
+                csv_paginas = io.BytesIO()
+                df_filtrado.to_csv(csv_paginas, index=False, encoding="utf-8")
+                csv_paginas.seek(0)
                 st.download_button("Descargar páginas (CSV)", data=csv_paginas, file_name="paginas_menciones.csv")
                 st.download_button(
-                    "Descargar páginas (JSON)", data=df_filtrado.to_json(orient="records"), file_name="paginas_menciones.json"
+                    "Descargar páginas (JSON)",
+                    data=df_filtrado.to_json(orient="records").encode("utf-8"),
+                    file_name="paginas_menciones.json",
                 )
                 pdf_buffer = _generar_pdf_simple(resumen, df_filtrado)
                 st.download_button(
@@ -331,7 +362,7 @@ else:
             with tab_dominios:
                 st.subheader("Dominios más frecuentes")
                 dominios_df = (
-                    df_paginas.groupby("dominio")
+                    df_paginas.groupby("dominio", observed=True, sort=False)
                     .agg(paginas=("url", "count"), menciones=("menciones_totales_pagina", "sum"))
                     .reset_index()
                     .sort_values(by="paginas", ascending=False)
@@ -41,6 +41,19 @@ class Settings(BaseSettings):
     crawl_profundidad_maxima: int = Field(
         5, description="Profundidad máxima de exploración permitida"
     )
+    crawl_descargas_concurrentes: int = Field(
+        16, description="Cantidad de páginas que se descargan en paralelo"
+    )
+    crawl_max_conexiones_por_host: int = Field(
+        4, description="Conexiones simultáneas máximas contra un mismo sitio"
+    )
+    crawl_respetar_robots: bool = Field(
+        True, description="Consultar robots.txt antes de descargar cada página"
+    )
+    crawl_max_bytes_pagina: int = Field(
+        5_000_000,
+        description="Tamaño máximo (Content-Length) de una página para descargarla",
+    )
     reporte_titulo: str = Field(
         "Reporte de menciones", description="Título para los reportes generados"
     )
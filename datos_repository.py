@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import pandas as pd
@@ -21,6 +21,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     create_engine,
+    event,
     inspect,
     select,
     text as sql_text,
@@ -36,6 +37,18 @@ engine = create_engine(settings.database_url, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _configurar_sqlite(conexion_dbapi, _registro_conexion) -> None:
+        """WAL y `synchronous=NORMAL`: un fsync por checkpoint en lugar de uno por commit."""
+
+        cursor = conexion_dbapi.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
 class Pagina(Base):
     __tablename__ = "paginas"
 
@@ -109,72 +122,91 @@ def inicializar_bd() -> None:
     ensure_schema()
 
 
-def _obtener_o_crear_termino(session: Session, termino_texto: str) -> Termino:
-    termino = session.execute(
-        select(Termino).where(Termino.termino_texto == termino_texto)
-    ).scalar_one_or_none()
-    if termino is None:
-        termino = Termino(termino_texto=termino_texto)
-        session.add(termino)
-        session.flush()
-    return termino
+def guardar_paginas_con_menciones(
+    paginas: Iterable[Tuple[str, str, str, datetime | None, Dict[str, int]]]
+) -> None:
+    """Guarda varias páginas y sus menciones en una única transacción.
 
+    Cada elemento es `(url, titulo, texto, fecha_publicacion, menciones_por_termino)`.
+    Las páginas, términos y menciones existentes se consultan en bloque en lugar
+    de hacer una consulta por fila, y todo se confirma con un solo commit.
+    """
 
-def guardar_pagina(url: str, titulo: str, texto: str, fecha_publicacion: datetime | None) -> int:
-    """Inserta o actualiza una página y devuelve su ID."""
+    paginas = list(paginas)
+    if not paginas:
+        return
 
-    dominio = urlparse(url).netloc
     with session_scope() as session:
-        pagina = session.execute(select(Pagina).where(Pagina.url == url)).scalar_one_or_none()
-        ahora = datetime.utcnow()
-        if pagina:
-            pagina.titulo = pagina.titulo or titulo
-            pagina.texto = pagina.texto or texto
-            pagina.dominio = pagina.dominio or dominio
-            pagina.fecha_publicacion = pagina.fecha_publicacion or fecha_publicacion
-            pagina.fecha_ultima_vez_vista = ahora
-        else:
-            pagina = Pagina(
-                url=url,
-                dominio=dominio,
-                titulo=titulo,
-                texto=texto,
-                fecha_publicacion=fecha_publicacion,
-                fecha_primera_vez_vista=ahora,
-                fecha_ultima_vez_vista=ahora,
-            )
-            session.add(pagina)
-            session.flush()
-        return int(pagina.id)
-
+        urls = {url for url, *_ in paginas}
+        paginas_por_url = {
+            pagina.url: pagina
+            for pagina in session.execute(select(Pagina).where(Pagina.url.in_(urls))).scalars()
+        }
 
-def registrar_menciones(pagina_id: int, menciones_por_termino: Dict[str, int]) -> None:
-    """Registra las menciones de cada término para una página concreta."""
-
-    with session_scope() as session:
-        pagina = session.get(Pagina, pagina_id)
-        if not pagina:
-            return
-
-        for termino_texto, cantidad in menciones_por_termino.items():
-            if cantidad <= 0:
-                continue
-            termino = _obtener_o_crear_termino(session, termino_texto)
-            mencion = session.execute(
-                select(Mencion).where(
-                    Mencion.pagina_id == pagina.id, Mencion.termino_id == termino.id
-                )
-            ).scalar_one_or_none()
-            if mencion:
-                mencion.cantidad_menciones = cantidad
+        ahora = datetime.utcnow()
+        for url, titulo, texto, fecha_publicacion, _ in paginas:
+            pagina = paginas_por_url.get(url)
+            if pagina:
+                pagina.titulo = pagina.titulo or titulo
+                pagina.texto = pagina.texto or texto
+                pagina.dominio = pagina.dominio or urlparse(url).netloc
+                pagina.fecha_publicacion = pagina.fecha_publicacion or fecha_publicacion
+                pagina.fecha_ultima_vez_vista = ahora
             else:
-                session.add(
-                    Mencion(
-                        pagina_id=pagina.id,
-                        termino_id=termino.id,
-                        cantidad_menciones=cantidad,
-                    )
+                pagina = Pagina(
+                    url=url,
+                    dominio=urlparse(url).netloc,
+                    titulo=titulo,
+                    texto=texto,
+                    fecha_publicacion=fecha_publicacion,
+                    fecha_primera_vez_vista=ahora,
+                    fecha_ultima_vez_vista=ahora,
                 )
+                session.add(pagina)
+                paginas_por_url[url] = pagina
+
+        textos_terminos = {
+            termino
+            for *_, menciones in paginas
+            for termino, cantidad in menciones.items()
+            if cantidad > 0
+        }
+        terminos_por_texto = {
+            termino.termino_texto: termino
+            for termino in session.execute(
+                select(Termino).where(Termino.termino_texto.in_(textos_terminos))
+            ).scalars()
+        }
+        for termino_texto in textos_terminos - terminos_por_texto.keys():
+            termino = Termino(termino_texto=termino_texto)
+            session.add(termino)
+            terminos_por_texto[termino_texto] = termino
+
+        # Un único flush asigna los IDs de todas las páginas y términos nuevos.
+        session.flush()
+
+        ids_paginas = {pagina.id for pagina in paginas_por_url.values()}
+        menciones_existentes = {
+            (mencion.pagina_id, mencion.termino_id): mencion
+            for mencion in session.execute(
+                select(Mencion).where(Mencion.pagina_id.in_(ids_paginas))
+            ).scalars()
+        }
+        for url, *_, menciones in paginas:
+            pagina_id = paginas_por_url[url].id
+            for termino_texto, cantidad in menciones.items():
+                if cantidad <= 0:
+                    continue
+                clave = (pagina_id, terminos_por_texto[termino_texto].id)
+                mencion = menciones_existentes.get(clave)
+                if mencion:
+                    mencion.cantidad_menciones = cantidad
+                else:
+                    mencion = Mencion(
+                        pagina_id=clave[0], termino_id=clave[1], cantidad_menciones=cantidad
+                    )
+                    session.add(mencion)
+                    menciones_existentes[clave] = mencion
 
 
 def obtener_paginas_con_menciones(
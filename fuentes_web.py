@@ -6,18 +6,44 @@ interfaz homogénea.
 """
 from __future__ import annotations
 
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
-from urllib.parse import urlparse
+from itertools import zip_longest
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse, urlsplit
+from urllib.robotparser import RobotFileParser
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from dateutil import parser
 from ddgs import DDGS
 
 from config import settings
 
+# Parser HTML: lxml (C) si está instalado; si no, el parser puro Python.
+try:
+    import lxml  # noqa: F401
+
+    PARSER_HTML = "lxml"
+except ImportError:
+    PARSER_HTML = "html.parser"
+
 USER_AGENT = "Mozilla/5.0 (compatible; BuscadorMenciones/1.0; +https://example.com)"
+TIPOS_CONTENIDO_HTML = ("text/html", "application/xhtml+xml")
+_RE_DOMINIO = re.compile(r"https?://([^/?#]+)", re.IGNORECASE)
+# Consultas DDG simultáneas en modo "cualquiera"; más clientes a la vez provocan rate limit.
+_MAX_CONSULTAS_DDG_SIMULTANEAS = 2
+
+# robots.txt ya consultados por sitio (None: sin reglas o no disponible), con desalojo LRU.
+_ROBOTS_MAX_SITIOS = 1024
+_robots_por_sitio: OrderedDict[str, Optional[RobotFileParser]] = OrderedDict()
+# Un lock por sitio mientras se descarga su robots.txt: un solo hilo lo pide.
+_robots_descargas: Dict[str, threading.Lock] = {}
+_robots_lock = threading.Lock()
 
 
 @dataclass
@@ -36,6 +62,13 @@ class ResultadoBusqueda:
 PROFUNDIDAD_OPCIONES = {1: 60, 2: 120, 3: 180, 4: 240, 5: 300}
 
 
+def extraer_dominio(url: str) -> str:
+    """Devuelve el host de una URL http(s) con una regex; `urlparse` solo como respaldo."""
+
+    coincidencia = _RE_DOMINIO.match(url)
+    return coincidencia.group(1) if coincidencia else urlparse(url).netloc
+
+
 def construir_query(grupo_terminos: List[str], modo_coincidencia: str) -> str:
     """Combina términos entrecomillados. Se puede extender a operadores lógicos."""
 
@@ -117,14 +150,136 @@ def _extraer_canonica_y_enlaces(soup: BeautifulSoup, url: str) -> Tuple[str, Lis
     return canonica, enlaces
 
 
-def extraer_texto_y_fecha_de_url(url: str, timeout: int = 10) -> Tuple[str, Optional[str], Optional[str], List[str]]:
+def _es_html_aceptable(cabeceras) -> bool:
+    """Descarta por cabeceras respuestas que no son HTML o que son demasiado grandes."""
+
+    tipo = cabeceras.get("Content-Type", "").split(";", 1)[0].strip().lower()
+    if tipo and tipo not in TIPOS_CONTENIDO_HTML:
+        return False
+    longitud = cabeceras.get("Content-Length", "")
+    return not (longitud.isdigit() and int(longitud) > settings.crawl_max_bytes_pagina)
+
+
+def _recortar_utf8_incompleto(contenido: bytes) -> bytes:
+    """Quita un carácter UTF-8 partido al final por el límite de tamaño.
+
+    Con la secuencia cortada la decodificación UTF-8 falla y BeautifulSoup cae a
+    windows-1252, lo que corrompe las tildes de toda la página.
+    """
+
+    for atras in range(1, min(4, len(contenido)) + 1):
+        byte = contenido[-atras]
+        if byte < 0x80:
+            return contenido
+        if byte >= 0xC0:
+            largo = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return contenido[:-atras] if largo > atras else contenido
+    return contenido
+
+
+def _leer_cuerpo_limitado(resp: requests.Response, max_bytes: int) -> bytes:
+    """Lee el cuerpo por bloques y lo corta en `max_bytes`, aunque falte Content-Length."""
+
+    contenido = bytearray()
+    for bloque in resp.iter_content(chunk_size=65536):
+        contenido += bloque
+        if len(contenido) >= max_bytes:
+            return _recortar_utf8_incompleto(bytes(contenido[:max_bytes]))
+    return bytes(contenido)
+
+
+def _declara_charset(cabeceras) -> bool:
+    """Indica si el Content-Type trae charset; si no, el parser lo detecta del HTML."""
+
+    return "charset" in cabeceras.get("Content-Type", "").lower()
+
+
+def _reglas_en_cache(sitio: str) -> Tuple[bool, Optional[RobotFileParser]]:
+    """Devuelve (consultado, reglas) del sitio y lo marca como usado recientemente."""
+
+    with _robots_lock:
+        if sitio not in _robots_por_sitio:
+            return False, None
+        _robots_por_sitio.move_to_end(sitio)
+        return True, _robots_por_sitio[sitio]
+
+
+def _robots_permite(url: str, cliente) -> bool:
+    """Indica si robots.txt permite descargar la URL; se consulta una vez por sitio.
+
+    Como `RobotFileParser.read`, un 401/403 prohíbe todo el sitio; si el archivo
+    no existe o no se puede leer, se permite la descarga.
+    """
+
+    partes = urlsplit(url)
+    sitio = f"{partes.scheme}://{partes.netloc}"
+    consultado, reglas = _reglas_en_cache(sitio)
+    if not consultado:
+        with _robots_lock:
+            descarga = _robots_descargas.setdefault(sitio, threading.Lock())
+        with descarga:
+            # Otro hilo pudo haberlo descargado mientras se esperaba el lock.
+            consultado, reglas = _reglas_en_cache(sitio)
+            if not consultado:
+                try:
+                    resp = cliente.get(
+                        f"{sitio}/robots.txt",
+                        headers={"User-Agent": USER_AGENT},
+                        timeout=settings.crawl_timeout,
+                    )
+                    if resp.status_code == 200:
+                        reglas = RobotFileParser()
+                        reglas.parse(resp.text.splitlines())
+                    elif resp.status_code in (401, 403):
+                        reglas = RobotFileParser()
+                        reglas.disallow_all = True
+                except Exception:
+                    reglas = None
+                with _robots_lock:
+                    _robots_por_sitio[sitio] = reglas
+                    _robots_descargas.pop(sitio, None)
+                    while len(_robots_por_sitio) > _ROBOTS_MAX_SITIOS:
+                        _robots_por_sitio.popitem(last=False)
+    return reglas is None or reglas.can_fetch(USER_AGENT, url)
+
+
+def _crear_sesion_http() -> requests.Session:
+    """Crea una sesión HTTP con pool de conexiones compartible entre hilos.
+
+    Cada sitio tiene su propio pool limitado y bloqueante: como mucho
+    `crawl_max_conexiones_por_host` descargas simultáneas contra un mismo host,
+    y el resto espera una conexión libre en lugar de provocar 429 y reintentos.
+    """
+
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(
+        pool_connections=settings.crawl_descargas_concurrentes * 4,
+        pool_maxsize=settings.crawl_max_conexiones_por_host,
+        pool_block=True,
+    )
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+def extraer_texto_y_fecha_de_url(
+    url: str, timeout: int = 10, session: Optional[requests.Session] = None
+) -> Tuple[str, Optional[str], Optional[str], List[str]]:
     """Descarga una URL y devuelve texto, fecha y enlaces para crawling ligero."""
 
+    cliente = session or requests
     try:
-        resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
-        if resp.status_code != 200:
+        if settings.crawl_respetar_robots and not _robots_permite(url, cliente):
             return "", None, None, []
-        soup = BeautifulSoup(resp.text, "html.parser")
+        # Con stream=True el cuerpo solo se descarga si es HTML y no supera el tamaño máximo.
+        with cliente.get(
+            url, headers={"User-Agent": USER_AGENT}, timeout=timeout, stream=True
+        ) as resp:
+            if resp.status_code != 200 or not _es_html_aceptable(resp.headers):
+                return "", None, None, []
+            html = _leer_cuerpo_limitado(resp, settings.crawl_max_bytes_pagina)
+            codificacion = resp.encoding if _declara_charset(resp.headers) else None
+        soup = BeautifulSoup(html, PARSER_HTML, from_encoding=codificacion)
         parrafos = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
         fecha_publicacion = extraer_fecha_publicacion(soup)
         canonica, enlaces = _extraer_canonica_y_enlaces(soup, url)
@@ -133,6 +288,46 @@ def extraer_texto_y_fecha_de_url(url: str, timeout: int = 10) -> Tuple[str, Opti
         return "", None, None, []
 
 
+def _consultar_ddg(query: str, max_resultados: int) -> List[dict]:
+    """Ejecuta una consulta en DDG; ante un error devuelve lo obtenido hasta ese punto."""
+
+    resultados: List[dict] = []
+    try:
+        with DDGS() as buscador:
+            for resultado in buscador.text(query, max_results=max_resultados, safesearch="moderate"):
+                resultados.append(resultado)
+    except Exception as e:
+        print(f"Error durante la búsqueda en DDG: {e}")
+    return resultados
+
+
+def _resultados_ddg(
+    grupo_terminos: List[str], max_resultados: int, modo_coincidencia: str
+) -> List[dict]:
+    """Obtiene los resultados crudos de DDG para el grupo de términos.
+
+    En modo "cualquiera" la consulta con OR equivale a la unión de una consulta
+    por término: se lanzan de a pocas en paralelo y se intercalan para conservar
+    el ranking de cada una. Cada término pide `max_resultados` porque la unión
+    tiene duplicados; el recorte final lo hace quien consume la lista. En los
+    demás modos se usa una única consulta combinada.
+    """
+
+    if modo_coincidencia != "cualquiera" or len(grupo_terminos) < 2:
+        return _consultar_ddg(construir_query(grupo_terminos, modo_coincidencia), max_resultados)
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(grupo_terminos), _MAX_CONSULTAS_DDG_SIMULTANEAS)
+    ) as executor:
+        listas = list(
+            executor.map(
+                lambda termino: _consultar_ddg(construir_query([termino], "frase_exacta"), max_resultados),
+                grupo_terminos,
+            )
+        )
+    return [resultado for fila in zip_longest(*listas) for resultado in fila if resultado is not None]
+
+
 def _buscar_ddg_iterativo(
     grupo_terminos: List[str],
     max_resultados: int,
@@ -143,25 +338,46 @@ def _buscar_ddg_iterativo(
 ) -> List[ResultadoBusqueda]:
     """Busca usando ddgs de manera paginada y aplica crawling ligero opcional."""
 
-    query = construir_query(grupo_terminos, modo_coincidencia)
     resultados: List[ResultadoBusqueda] = []
     vistos: set[str] = set()
 
     try:
-        with DDGS() as buscador:
-            for resultado in buscador.text(query, max_results=max_resultados, safesearch="moderate"):
-                url = resultado.get("href") or resultado.get("url")
-                if not url or url in vistos:
-                    continue
-                dominio = urlparse(url).netloc
-                if dominio_filtro and dominio_filtro.lower() not in dominio.lower():
+        # Primero se recogen los candidatos de DDG y luego se descargan en paralelo.
+        candidatos: List[Tuple[str, str, dict]] = []
+        urls_candidatas: set[str] = set()
+        filtro_dominio = dominio_filtro.lower() if dominio_filtro else None
+        for resultado in _resultados_ddg(grupo_terminos, max_resultados, modo_coincidencia):
+            url = resultado.get("href") or resultado.get("url")
+            if not url or url in urls_candidatas:
+                continue
+            dominio = extraer_dominio(url)
+            if filtro_dominio and filtro_dominio not in dominio.lower():
+                continue
+            urls_candidatas.add(url)
+            candidatos.append((url, dominio, resultado))
+            if len(candidatos) >= max_resultados:
+                break
+
+        # Los enlaces secundarios usan su propio pool, sin esperar a las primarias encoladas.
+        with _crear_sesion_http() as sesion, ThreadPoolExecutor(
+            max_workers=settings.crawl_descargas_concurrentes
+        ) as executor, ThreadPoolExecutor(
+            max_workers=max(1, settings.crawl_descargas_concurrentes // 4)
+        ) as executor_secundario:
+
+            def descargar(url: str) -> Tuple[str, Optional[str], Optional[str], List[str]]:
+                return extraer_texto_y_fecha_de_url(
+                    url, timeout=settings.crawl_timeout, session=sesion
+                )
+
+            descargas = executor.map(descargar, [url for url, _, _ in candidatos])
+            for (url, dominio, resultado), descarga in zip(candidatos, descargas):
+                if url in vistos:
                     continue
 
                 titulo = resultado.get("title") or ""
                 snippet = resultado.get("body") or resultado.get("snippet") or ""
-                texto, fecha_detectada, canonica, enlaces = extraer_texto_y_fecha_de_url(
-                    url, timeout=settings.crawl_timeout
-                )
+                texto, fecha_detectada, canonica, enlaces = descarga
                 fecha_publicacion = fecha_detectada or resultado.get("date") or resultado.get("published")
                 canonica_normalizada = canonica or url
                 if canonica_normalizada in vistos:
@@ -183,21 +399,25 @@ def _buscar_ddg_iterativo(
                 )
 
                 if crawl_extendido and len(resultados) < max_resultados:
-                    secundarios = enlaces[: settings.crawl_profundo_max_enlaces]
-                    for enlace in secundarios:
+                    # Enlaces secundarios: en paralelo, sin repetidos y hasta el cupo restante.
+                    secundarios = [
+                        enlace
+                        for enlace in dict.fromkeys(enlaces[: settings.crawl_profundo_max_enlaces])
+                        if enlace not in vistos and not (canonica and enlace == canonica)
+                    ][: max_resultados - len(resultados)]
+                    descargas_secundarias = executor_secundario.map(descargar, secundarios)
+                    for enlace, descarga_s in zip(secundarios, descargas_secundarias):
                         if len(resultados) >= max_resultados:
                             break
-                        if enlace in vistos or (canonica and enlace == canonica):
+                        if enlace in vistos:
                             continue
-                        texto_s, fecha_s, canonica_s, _ = extraer_texto_y_fecha_de_url(
-                            enlace, timeout=settings.crawl_timeout
-                        )
+                        texto_s, fecha_s, canonica_s, _ = descarga_s
                         vistos.add(canonica_s or enlace)
                         resultados.append(
                             ResultadoBusqueda(
                                 url=enlace,
                                 titulo=titulo,
-                                dominio=urlparse(enlace).netloc,
+                                dominio=extraer_dominio(enlace),
                                 snippet=snippet,
                                 texto=texto_s,
                                 fecha_publicacion=fecha_s,
@@ -209,7 +429,7 @@ def _buscar_ddg_iterativo(
                         if profundidad_max > 2 and texto_s:
                             # pequeños enlaces adicionales
                             try:
-                                soup_tmp = BeautifulSoup(texto_s, "html.parser")
+                                soup_tmp = BeautifulSoup(texto_s, PARSER_HTML)
                             except Exception:
                                 soup_tmp = None
                             if soup_tmp:
@@ -219,15 +439,13 @@ def _buscar_ddg_iterativo(
                                         break
                                     if enlace2 in vistos:
                                         continue
-                                    texto_t, fecha_t, canonica_t, _ = extraer_texto_y_fecha_de_url(
-                                        enlace2, timeout=settings.crawl_timeout
-                                    )
+                                    texto_t, fecha_t, canonica_t, _ = descargar(enlace2)
                                     vistos.add(canonica_t or enlace2)
                                     resultados.append(
                                         ResultadoBusqueda(
                                             url=enlace2,
                                             titulo=titulo,
-                                            dominio=urlparse(enlace2).netloc,
+                                            dominio=extraer_dominio(enlace2),
                                             snippet=snippet,
                                             texto=texto_t,
                                             fecha_publicacion=fecha_t,